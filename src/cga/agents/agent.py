@@ -1,8 +1,11 @@
 from abc import ABC
-import json
+import hashlib
 from typing import Any
+
+import orjson
 import tiktoken
 from cga.agents.actions import ActionProvider, AgentAction
+from cga.llm.cache import LLMResponseCache
 from cga.llm.client import LLMClient
 from cga.utils.llm_response import trim_json_markers
 import time
@@ -10,15 +13,25 @@ import time
 import logging
 logger = logging.getLogger(__name__)
 
+# one shared encoding for metrics; loading it is expensive and it is stateless
+_metrics_enc = None
+
+def _get_metrics_encoding():
+    global _metrics_enc
+    if _metrics_enc is None:
+        _metrics_enc = tiktoken.get_encoding("o200k_base")
+    return _metrics_enc
+
 class Agent(ABC):
-    def __init__(self, llm_client: LLMClient):
+    def __init__(self, llm_client: LLMClient, response_cache: LLMResponseCache | None = None):
         self.llm_client = llm_client
+        self._response_cache = response_cache
         self._metrics = {
             "in_tokens": 0,
             "out_tokens": 0,
             "time_secs": 0
         }
-        self._metrics_enc = tiktoken.get_encoding("o200k_base")
+        self._metrics_enc = _get_metrics_encoding()
         self._actions: dict[str, AgentAction] = {}
 
     def get_metrics(self) -> dict:
@@ -31,24 +44,62 @@ class Agent(ABC):
         self._metrics["in_tokens"] += tokens
 
     def _get_number_of_out_tokens(self, prompt:str) -> int:
-        return len(self._metrics_enc.encode(prompt))
+        # encode_ordinary skips the special-token scan; we only need the count
+        return len(self._metrics_enc.encode_ordinary(prompt))
     
-    def _llm_json(self, prompt: str) -> dict:
+    def _cache_key(self, prompt: str) -> str:
+        return hashlib.sha256(prompt.encode()).hexdigest()
+
+    def _llm_json(self, prompt: str, cache_key: str | None = None) -> dict:
+        if self._response_cache is not None:
+            cached = self._response_cache.get(self._cache_key(prompt))
+            if cached is not None:
+                return self._parse_json_response(cached)
         _in_tokens = self._get_number_of_out_tokens(prompt)
         self._inc_in_token(_in_tokens)
         start_at = time.perf_counter()
-        content = self.llm_client.single_round(prompt)
+        content = self.llm_client.single_round(prompt, cache_key=cache_key)
         end_at = time.perf_counter()
         self._metrics["time_secs"] += end_at - start_at
         _out_tokens = self._get_number_of_out_tokens(content)
         self._inc_out_token(_out_tokens)
 
+        if self._response_cache is not None:
+            self._response_cache.put(self._cache_key(prompt), content)
+        return self._parse_json_response(content)
+
+    def _llm_json_batch(self, prompts: list[str]) -> list[dict]:
+        contents: list[str | None] = [None] * len(prompts)
+        misses = list(range(len(prompts)))
+        if self._response_cache is not None:
+            misses = []
+            for idx, prompt in enumerate(prompts):
+                cached = self._response_cache.get(self._cache_key(prompt))
+                if cached is not None:
+                    contents[idx] = cached
+                else:
+                    misses.append(idx)
+        if misses:
+            for idx in misses:
+                self._inc_in_token(self._get_number_of_out_tokens(prompts[idx]))
+            start_at = time.perf_counter()
+            fetched = self.llm_client.batch_single_round([prompts[idx] for idx in misses])
+            end_at = time.perf_counter()
+            self._metrics["time_secs"] += end_at - start_at
+            for idx, content in zip(misses, fetched):
+                self._inc_out_token(self._get_number_of_out_tokens(content))
+                if self._response_cache is not None:
+                    self._response_cache.put(self._cache_key(prompts[idx]), content)
+                contents[idx] = content
+        return [self._parse_json_response(content) for content in contents]
+
+    def _parse_json_response(self, content: str) -> dict:
         logger.debug(f"[LLM Response]: \"{content}\"")
 
         trimmed_content = trim_json_markers(content)
         if not trimmed_content:
             return {}
-        return json.loads(trimmed_content)
+        return orjson.loads(trimmed_content)
 
     def add_action(self, action: AgentAction):
         # if action.name in self._actions:
@@ -90,13 +141,12 @@ Respond with a JSON object:
     
     def _handle_actions(self, actions: list[dict]) -> Any:
         results = []
+        action_table = self._actions
         for action_dict in actions:
             action_name = action_dict.get("name")
-            action_input = action_dict.get("input", {})
-            if action_name not in self._actions:
+            action = action_table.get(action_name)
+            if action is None:
                 raise ValueError(f"Unknown action: {action_name}")
-            action = self._actions[action_name]
-            result = action.fn(**action_input)
-            results.append(result)
+            results.append(action.fn(**action_dict.get("input", {})))
         return results
     
@@ -1,6 +1,7 @@
 from cga.agents.actions import ActionProvider, AgentAction, JsonSchema
 from cga.agents.agent import Agent
 from cga.agents.doc.doc_agent import DocAgent
+from cga.llm.cache import LLMResponseCache
 from cga.llm.client import LLMClient
 from cga.agents.callgraph.types import CallGraph, CallGraphEdge, CallGraphNode
 from cga.utils.fs import FileSystem
@@ -17,14 +18,19 @@ class CallGraphAgent(Agent, ActionProvider):
     def __init__(self, 
         llm_client: LLMClient, 
         fs: FileSystem,
+        response_cache: LLMResponseCache | None = None,
     ):
-        super().__init__(llm_client)
+        super().__init__(llm_client, response_cache=response_cache)
         self.fs = fs
         self.add_action_provider(self)
         self._graph: CallGraph = CallGraph(nodes=[], edges=[])
+        # name -> nodes with that name, built once per run
+        self._name_index: dict[str, list[CallGraphNode]] = {}
         self._start_line = 1
         self._end_line = 30
         self._max_lines = None
+        # max total lines packed into one batched call-extraction prompt
+        self._batch_max_lines = 120
         
     def run(self, file_or_dir: str) -> CallGraph:
         # Implementation for extracting call graph information goes here
@@ -76,15 +82,96 @@ class CallGraphAgent(Agent, ActionProvider):
         
         # collect function call relationships
         self._graph.nodes = all_functions
-        for func in all_functions:
-            edges = self._extract_calls_from_func(func)
+        self._name_index = {}
+        for node in all_functions:
+            self._name_index.setdefault(node.name, []).append(node)
+        # batches are independent of each other, so their prompts can be
+        # submitted to the LLM in one concurrent fan-out
+        batches = self._batch_funcs(all_functions)
+        prompts = [
+            self._single_call_prompt(batch[0]) if len(batch) == 1 else self._batch_call_prompt(batch)
+            for batch in batches
+        ]
+        for batch, actions_res in zip(batches, self._llm_json_batch(prompts)):
+            if len(batch) == 1:
+                edges = self._edges_from_single(batch[0], actions_res)
+            else:
+                edges = self._edges_from_batch(batch, actions_res)
             self._graph.edges.extend(edges)
 
         return self._graph
-    
-    def _extract_calls_from_func(self, func: CallGraphNode) -> list[CallGraphEdge]:
-        # Implementation for extracting function calls from a given function
+
+    def _batch_funcs(self, funcs: list[CallGraphNode]) -> list[list[CallGraphNode]]:
+        # Pack functions of the same file into batches so one LLM round trip
+        # covers several function bodies. A function bigger than the budget
+        # gets its own batch and falls back to the single-function path.
+        batches: list[list[CallGraphNode]] = []
+        current: list[CallGraphNode] = []
+        current_file = None
+        current_lines = 0
+        for func in funcs:
+            func_lines = func.loc.line_end - func.loc.line_start + 1
+            if current and (func.loc.file != current_file or current_lines + func_lines > self._batch_max_lines):
+                batches.append(current)
+                current = []
+                current_lines = 0
+            current.append(func)
+            current_file = func.loc.file
+            current_lines += func_lines
+        if current:
+            batches.append(current)
+        return batches
+
+    def _batch_call_prompt(self, funcs: list[CallGraphNode]) -> str:
+        # One prompt covering several function bodies of the same file
+        sections = []
+        for func in funcs:
+            content = self.fs.read_file_with_lines(
+                func.loc.file,
+                func.loc.line_start,
+                func.loc.line_end,
+                with_linenum=True
+            )
+            sections.append(f"### FUNC {func.id()}\n{content}")
+        return self._get_prompt(self._get_cg_prompt("\n\n".join(sections)))
+
+    def _extract_calls_batch(self, funcs: list[CallGraphNode]) -> list[CallGraphEdge]:
+        # Extract function calls for several functions of the same file in one LLM round
+        prompt = self._batch_call_prompt(funcs)
+
+        logger.debug(f"[LLM Prompt]: \"{prompt}\"")
+        actions_res = self._llm_json(prompt)
+        return self._edges_from_batch(funcs, actions_res)
+
+    def _edges_from_batch(self, funcs: list[CallGraphNode], actions_res: dict) -> list[CallGraphEdge]:
+        actions = actions_res.get("actions", [])
+        results = self._handle_actions(actions)
         edges: list[CallGraphEdge] = []
+        for (action, result) in zip(actions, results):
+            if action.get("name") == "record_function_call":
+                callee_name = result["name"]
+                call_line = result["file_line"]
+                # attribute the call to the function whose line range contains it
+                caller = next((f for f in funcs if f.loc.line_start <= call_line <= f.loc.line_end), None)
+                if caller is None:
+                    continue
+                callee_node = self._lookup_node(callee_name)
+                if callee_node:
+                    edge = CallGraphEdge(
+                        caller_id=caller.id(),
+                        callee_id=callee_node.id(),
+                        attributes={
+                            "loc": {
+                                "file": caller.loc.file,
+                                "line_start": call_line,
+                                "line_end": call_line
+                            }
+                        }
+                    )
+                    edges.append(edge)
+        return edges
+
+    def _single_call_prompt(self, func: CallGraphNode) -> str:
         # Read the function's source code from the file
         content = self.fs.read_file_with_lines(
             func.loc.file, 
@@ -92,20 +179,29 @@ class CallGraphAgent(Agent, ActionProvider):
             func.loc.line_end, 
             with_linenum=True
         )
-        prompt = self._get_prompt(self._get_cg_prompt(content))
+        return self._get_prompt(self._get_cg_prompt(content))
+
+    def _extract_calls_from_func(self, func: CallGraphNode) -> list[CallGraphEdge]:
+        # Implementation for extracting function calls from a given function
+        prompt = self._single_call_prompt(func)
 
         logger.debug(f"[LLM Prompt]: \"{prompt}\"")
         actions_res = self._llm_json(prompt)
+        return self._edges_from_single(func, actions_res)
+
+    def _edges_from_single(self, func: CallGraphNode, actions_res: dict) -> list[CallGraphEdge]:
+        edges: list[CallGraphEdge] = []
         actions = actions_res.get("actions", [])
         results = self._handle_actions(actions)
+        caller_id = func.id()
         for (action, result) in zip(actions, results):
             if action.get("name") == "record_function_call":
                 callee_name = result["name"]
                 call_line = result["file_line"]
-                callee_node = next((n for n in self._graph.nodes if n.name == callee_name), None)
+                callee_node = self._lookup_node(callee_name)
                 if callee_node:
                     edge = CallGraphEdge(
-                        caller_id=func.id(),
+                        caller_id=caller_id,
                         callee_id=callee_node.id(),
                         attributes={
                             "loc": {
@@ -118,9 +214,13 @@ class CallGraphAgent(Agent, ActionProvider):
                     edges.append(edge)
         return edges
     
+    def _lookup_node(self, name: str) -> CallGraphNode | None:
+        candidates = self._name_index.get(name)
+        return candidates[0] if candidates else None
+
     def _find_function_by_name(self, name: str, file: str, file_line:int) -> CallGraphNode | None:
         # get candidates by name
-        candidates = [n for n in self._graph.nodes if n.name == name]
+        candidates = self._name_index.get(name, [])
         if not candidates:
             return None
         if len(candidates) == 1:
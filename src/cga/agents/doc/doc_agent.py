@@ -1,6 +1,10 @@
+import bisect
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 from cga.agents.actions import ActionProvider, AgentAction, JsonSchema
 from cga.agents.agent import Agent
+from cga.llm.cache import LLMResponseCache
 from cga.llm.client import LLMClient
 from cga.utils.fs import FileSystem
 import logging
@@ -19,8 +23,9 @@ class DocAgent(Agent, ActionProvider):
         llm_client: LLMClient, 
         fs: FileSystem,
         targets: list[Target],
+        response_cache: LLMResponseCache | None = None,
     ):
-        super().__init__(llm_client)
+        super().__init__(llm_client, response_cache=response_cache)
         self.fs = fs
         self.targets = targets
         self._current_file = None
@@ -42,23 +47,85 @@ class DocAgent(Agent, ActionProvider):
         # record the blacked lines as (start, end) tuples
         # it will be used if the target does not contain line range information (e.g., start_line, end_line)
         self._blacked_lines:list[tuple[int, int]] = []
+        # actions are identical for every window of the same target;
+        # build them once per target and re-register only on target change
+        self._actions_cache: dict[str, list[AgentAction]] = {}
+        self._registered_target_id = None
 
     def run(self, file: str) -> list[Any]:
         self._current_file = file
-        self._start_line_limit = 1
-        self._end_line_limit = self.fs.get_file_metadata(file).lines
-        for target in self.targets:
+        total_lines = self.fs.get_file_metadata(file).lines
+        # work queue of (target, start_limit, end_limit, parent_result);
+        # scanning a target with children enqueues one item per (result, child)
+        queue = deque((target, 1, total_lines, None) for target in self.targets)
+        while queue:
+            target, start_limit, end_limit, parent = queue.popleft()
             self._current_target = target
+            self._current_parent_found = parent
+            self._start_line_limit = start_limit
+            self._end_line_limit = end_limit
+            if parent is not None:
+                # child scans start with a fresh exclusion list scoped to the parent
+                self._blacked_lines = []
+            sink = parent.children if parent is not None else self._found
+            found_before = len(sink)
             self._start_loop(target)
-        
+            if target.children:
+                for result in sink[found_before:]:
+                    target_start_line = result.data.get("start_line", 1)
+                    target_end_line = result.data.get("end_line", end_limit)
+                    for child_target in target.children:
+                        queue.append((child_target, target_start_line, target_end_line, result))
+        self._current_parent_found = None
+
         return self._found
-        
+
+    def run_files(self, files: list[str], max_workers: int = 16) -> list[Any]:
+        """
+        Run multiple files in parallel, one DocAgent clone per file.
+        The bottleneck is LLM network I/O, so threads are sufficient.
+        Returns the found results of all files merged in input order.
+        """
+        if len(files) <= 1:
+            return [result for file in files for result in self.run(file)]
+
+        def _run_one(file: str) -> list[Any]:
+            # clone with shared clients but independent scan state
+            agent = DocAgent(
+                llm_client=self.llm_client,
+                fs=self.fs,
+                targets=self.targets,
+                response_cache=self._response_cache,
+            )
+            agent._same_level_targets_overlap = self._same_level_targets_overlap
+            return agent.run(file)
+
+        with ThreadPoolExecutor(max_workers=min(len(files), max_workers)) as executor:
+            per_file = list(executor.map(_run_one, files))
+        merged = [result for results in per_file for result in results]
+        self._found.extend(merged)
+        return merged
+
     def _start_loop(self, target: Target = None):
-        self.add_action_provider(self)
+        if self._registered_target_id != target.id:
+            self.add_action_provider(self)
+            self._registered_target_id = target.id
         logger.debug(f"Starting loop with limit {self._start_line_limit}-{self._end_line_limit} for target {target.id}")
         self._start_line = max(1, self._start_line_limit)
         self._end_line = min(30, self._end_line_limit)
         self._omitted_lines = ""
+        # only the window content changes between iterations; build the
+        # static parts of the user input once per scan
+        prompt_prefix = (
+            f"Extract all targets align with definition \"{target.description}\" from the following document."
+            f"Document Path: {self._current_file}\n"
+            f"Current Part of Document:\n"
+        )
+        prompt_suffix = (
+            f"\nThe document has {self._end_line_limit - self._start_line_limit + 1} lines in total.\n"
+            f"If a target is found but not finished, return a retry_with action with appropriate line range.\n"
+            f"At most one retry_with action can be returned each time. Each time read more 30 lines (can be less than 30 if reaching the end of the document).\n"
+        )
         while True:
             logger.debug(f"reading lines {self._start_line} to {self._end_line} of file {self._current_file}")
             # Adjust the start and end line to skip blacked lines
@@ -66,17 +133,19 @@ class DocAgent(Agent, ActionProvider):
                 # case 1: 1 - 30, blacked: 5-10 => 1-4
                 # case 2: 1 - 30, blacked: 25-35 => 1-25
                 next_more_from = None
-                for (bstart, bend) in self._blacked_lines:
-                    
-                    if self._start_line <= bstart <= self._end_line:
-                        next_more_from = bend + 1
-                        self._end_line = bstart - 1                                   
-                        logger.debug(f"Adjusting reading lines to skip blacked lines ({bstart}-{bend}): now reading {self._start_line} to {self._end_line}")
-                        break
-                    elif self._start_line <= bend <= self._end_line:
-                        self._start_line = bend + 1
-                        logger.debug(f"Adjusting reading lines to skip blacked lines ({bstart}-{bend}): now reading {self._start_line} to {self._end_line}")
-                        break
+                blacked = self._blacked_lines
+                # ranges are sorted and merged, so only the range covering
+                # _start_line and the first range after it can overlap the window
+                idx = bisect.bisect_left(blacked, (self._start_line + 1, 0))
+                if idx > 0 and blacked[idx - 1][1] >= self._start_line:
+                    (bstart, bend) = blacked[idx - 1]
+                    self._start_line = bend + 1
+                    logger.debug(f"Adjusting reading lines to skip blacked lines ({bstart}-{bend}): now reading {self._start_line} to {self._end_line}")
+                elif idx < len(blacked) and blacked[idx][0] <= self._end_line:
+                    (bstart, bend) = blacked[idx]
+                    next_more_from = bend + 1
+                    self._end_line = bstart - 1
+                    logger.debug(f"Adjusting reading lines to skip blacked lines ({bstart}-{bend}): now reading {self._start_line} to {self._end_line}")
             if self._start_line > self._end_line:
                 logger.debug("All lines are blacked, moving to next more lines.")
                 if next_more_from is not None:
@@ -96,16 +165,10 @@ class DocAgent(Agent, ActionProvider):
             
             logger.debug(f"Read content:\n{content}")
             
-            prompt = self._get_prompt(
-                f"Extract all targets align with definition \"{target.description}\" from the following document."
-                f"Document Path: {self._current_file}\n"
-                f"Current Part of Document:\n{content}\n"
-                f"The document has {self._end_line_limit - self._start_line_limit + 1} lines in total.\n"
-                f"If a target is found but not finished, return a retry_with action with appropriate line range.\n"
-                f"At most one retry_with action can be returned each time. Each time read more 30 lines (can be less than 30 if reaching the end of the document).\n"
-            )
+            prompt = self._get_prompt(prompt_prefix + content + prompt_suffix)
             # logger.debug(f"[LLM Prompt]: \"{prompt}\"")
-            actions_res = self._llm_json(prompt)
+            # stable per (file, target) so the backend can reuse the shared prefix
+            actions_res = self._llm_json(prompt, cache_key=f"{self._current_file}:{target.id}")
             actions = actions_res.get("actions", [])
             self._handle_actions(actions)
             if self._end_line >= self._end_line_limit:
@@ -114,29 +177,7 @@ class DocAgent(Agent, ActionProvider):
             actions_names = [action.get("name", "") for action in actions]
             if "retry_with" not in actions_names:
                 self._next_more(30)
-                
-        if target.children:
-            # find all found belongs to this target
-            target_found = [f for f in self._found if f.target_id == target.id]
-            old_end_lines = self._end_line_limit
-            old_start_lines = self._start_line_limit
-            old_blacked_lines = self._blacked_lines
-            
-            # loop each target found to find children targets
-            for result in target_found:
-                self._current_parent_found = result
-                for child_target in target.children:
-                    self._current_target = child_target
-                    target_start_line = result.data.get("start_line", 1)
-                    target_end_line = result.data.get("end_line", old_end_lines)
-                    self._start_line_limit = target_start_line
-                    self._end_line_limit = target_end_line
-                    self._blacked_lines = []
-                    self._start_loop(child_target)
-            self._current_parent_found = None
-            self._start_line_limit = old_start_lines
-            self._end_line_limit = old_end_lines
-            self._blacked_lines = old_blacked_lines
+
     def _retry_with(self, start, end, omitted_lines: str = ""):
         self._start_line = start
         self._end_line = end
@@ -146,12 +187,26 @@ class DocAgent(Agent, ActionProvider):
         self._start_line = self._end_line + 1
         self._end_line = min(self._start_line + lines, self._end_line_limit)
 
+    def _black_lines(self, start_line: int, end_line: int):
+        # keep _blacked_lines sorted and merged so window adjustment can bisect
+        blacked = self._blacked_lines
+        idx = bisect.bisect_left(blacked, (start_line, end_line))
+        if idx > 0 and blacked[idx - 1][1] + 1 >= start_line:
+            idx -= 1
+            start_line = min(start_line, blacked[idx][0])
+            end_line = max(end_line, blacked[idx][1])
+            del blacked[idx]
+        while idx < len(blacked) and blacked[idx][0] <= end_line + 1:
+            end_line = max(end_line, blacked[idx][1])
+            del blacked[idx]
+        blacked.insert(idx, (start_line, end_line))
+
     def _found_target(self, **kwargs):
         if "start_line" in kwargs and "end_line" in kwargs:
             start_line = kwargs["start_line"]
             end_line = kwargs["end_line"]
             if not self._same_level_targets_overlap:
-                self._blacked_lines.append((start_line, end_line))
+                self._black_lines(start_line, end_line)
         
         data = kwargs
         if self._current_target.map_fn:
@@ -172,7 +227,10 @@ class DocAgent(Agent, ActionProvider):
         
 
     def get_actions(self) -> list:
-        return [
+        cached = self._actions_cache.get(self._current_target.id)
+        if cached is not None:
+            return cached
+        actions = [
             AgentAction(
                 name="found_target",
                 description="Indicates target definition has been found.",
@@ -203,6 +261,8 @@ class DocAgent(Agent, ActionProvider):
                 fn=lambda **kwargs: self._retry_with(kwargs["start"], kwargs["end"], kwargs.get("omitted_lines", ""))
             )
         ]
+        self._actions_cache[self._current_target.id] = actions
+        return actions
     
         
         
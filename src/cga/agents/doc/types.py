@@ -1,9 +1,10 @@
+from dataclasses import dataclass
 from typing import Any, Callable, Optional
-from pydantic import BaseModel
 from cga.agents.actions import JsonSchema
 
 
-class Target(BaseModel):
+@dataclass(slots=True)
+class Target:
     id: str
     description: str
     schema: JsonSchema
@@ -11,8 +12,8 @@ class Target(BaseModel):
     children: Optional[list['Target']] = None
 
 
-
-class Result(BaseModel):
+@dataclass(slots=True)
+class Result:
     target_id: str
     data: Any
     children: Optional[list['Result']] = None
@@ -1,3 +1,4 @@
+from cga.llm.cache import LLMResponseCache
 from cga.llm.client import LLMClient
 from cga.llm.ollama import (
     OllamaLLMClient,
@@ -11,6 +12,7 @@ from cga.llm.openai import GPT5, GPT5MINI, GPT5NANO
 
 __all__ = [
     "LLMClient",
+    "LLMResponseCache",
     "OllamaLLMClient",
     "GPTOSS_20B",
     "GEMMA3_27B",
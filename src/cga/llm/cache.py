@@ -0,0 +1,29 @@
+from collections import OrderedDict
+
+
+class LLMResponseCache:
+    """
+    Small LRU cache of raw LLM responses keyed by prompt hash.
+
+    Prompts embed the file path, the windowed content and the target
+    description, so any change to the underlying file produces a new
+    key and stale entries simply stop being hit.
+    """
+    def __init__(self, max_size: int = 100):
+        self._max_size = max_size
+        self._entries: OrderedDict[str, str] = OrderedDict()
+
+    def get(self, key: str) -> str | None:
+        content = self._entries.get(key)
+        if content is not None:
+            self._entries.move_to_end(key)
+        return content
+
+    def put(self, key: str, content: str) -> None:
+        self._entries[key] = content
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
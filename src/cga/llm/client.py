@@ -2,7 +2,12 @@ from abc import ABC, abstractmethod
 
 class LLMClient(ABC):
     @abstractmethod
-    def single_round(self, message: str) -> str:
+    def single_round(self, message: str, cache_key: str | None = None) -> str:
+        # cache_key is a stable identifier for the shared prompt prefix so
+        # backends that support server-side prompt caching can reuse prefill
         pass
 
-
+    def batch_single_round(self, messages: list[str]) -> list[str]:
+        # Default: serial fallback. HTTP-backed clients override this
+        # with a concurrent fan-out since requests are independent.
+        return [self.single_round(message) for message in messages]
@@ -1,17 +1,25 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
 from cga.llm.client import LLMClient
 from ollama import Client
 
 class OllamaLLMClient(LLMClient):
-    def __init__(self, host:str):
+    def __init__(self, host:str, model: str = "gpt-oss:20b"):
         super().__init__()
+        # ollama.Client forwards kwargs to the underlying httpx.Client;
+        # keep enough keepalive connections for batch_single_round fan-outs
         self.client = Client(
-            host=host
+            host=host,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
         )
+        self.model = model
 
-class GPTOSS_20B(OllamaLLMClient):
-
-    def single_round(self, message: str) -> str:
-        response = self.client.chat(model='gpt-oss:20b', messages=[
+    def single_round(self, message: str, cache_key: str | None = None) -> str:
+        # Ollama reuses the KV cache for shared prefixes automatically;
+        # cache_key is accepted for interface parity
+        response = self.client.chat(model=self.model, messages=[
             {
                 'role': 'user',
                 'content': message,
@@ -19,42 +27,29 @@ class GPTOSS_20B(OllamaLLMClient):
         ])
         return response['message']['content']
 
+    def batch_single_round(self, messages: list[str]) -> list[str]:
+        if len(messages) <= 1:
+            return [self.single_round(message) for message in messages]
+        with ThreadPoolExecutor(max_workers=min(len(messages), 8)) as executor:
+            return list(executor.map(self.single_round, messages))
+
+
+class GPTOSS_20B(OllamaLLMClient):
+    def __init__(self, host: str):
+        super().__init__(host, model='gpt-oss:20b')
+
 class GEMMA3_27B(OllamaLLMClient):
-    def single_round(self, message: str) -> str:
-        response = self.client.chat(model='gemma3:27b', messages=[
-            {
-                'role': 'user',
-                'content': message,
-            },
-        ])
-        return response['message']['content']
-    
+    def __init__(self, host: str):
+        super().__init__(host, model='gemma3:27b')
+
 class GEMMA3_12B(OllamaLLMClient):
-    def single_round(self, message: str) -> str:
-        response = self.client.chat(model='gemma3:12b', messages=[
-            {
-                'role': 'user',
-                'content': message,
-            },
-        ])
-        return response['message']['content']
+    def __init__(self, host: str):
+        super().__init__(host, model='gemma3:12b')
 
 class DEEPSEEKR1_32B(OllamaLLMClient):
-    def single_round(self, message: str) -> str:
-        response = self.client.chat(model='deepseek-r1:32b', messages=[
-            {
-                'role': 'user',
-                'content': message,
-            },
-        ])
-        return response['message']['content']
-    
+    def __init__(self, host: str):
+        super().__init__(host, model='deepseek-r1:32b')
+
 class DEEPSEEKR1_14B(OllamaLLMClient):
-    def single_round(self, message: str) -> str:
-        response = self.client.chat(model='deepseek-r1:14b', messages=[
-            {
-                'role': 'user',
-                'content': message,
-            },
-        ])
-        return response['message']['content']
\ No newline at end of file
+    def __init__(self, host: str):
+        super().__init__(host, model='deepseek-r1:14b')
@@ -1,41 +1,41 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from cga.llm.client import LLMClient
 from openai import OpenAI
 
 class OpenAIClient(LLMClient):
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, model: str = "gpt-5"):
         super().__init__()
         self.client = OpenAI(api_key=api_key)
+        self.model = model
 
-
-class GPT5(OpenAIClient):
-
-
-    def single_round(self, message: str) -> str:
+    def single_round(self, message: str, cache_key: str | None = None) -> str:
+        kwargs = {}
+        if cache_key is not None:
+            kwargs["prompt_cache_key"] = cache_key
         response = self.client.responses.create(
-            model="gpt-5",
+            model=self.model,
             input=message,
+            **kwargs,
         )
 
         return response.output_text
 
-class GPT5MINI(OpenAIClient):
+    def batch_single_round(self, messages: list[str]) -> list[str]:
+        if len(messages) <= 1:
+            return [self.single_round(message) for message in messages]
+        with ThreadPoolExecutor(max_workers=min(len(messages), 8)) as executor:
+            return list(executor.map(self.single_round, messages))
 
 
-    def single_round(self, message: str) -> str:
-        response = self.client.responses.create(
-            model="gpt-5-mini",
-            input=message,
-        )
+class GPT5(OpenAIClient):
+    def __init__(self, api_key: str):
+        super().__init__(api_key, model="gpt-5")
 
-        return response.output_text
+class GPT5MINI(OpenAIClient):
+    def __init__(self, api_key: str):
+        super().__init__(api_key, model="gpt-5-mini")
 
 class GPT5NANO(OpenAIClient):
-
-
-    def single_round(self, message: str) -> str:
-        response = self.client.responses.create(
-            model="gpt-5-nano",
-            input=message,
-        )
-
-        return response.output_text
\ No newline at end of file
+    def __init__(self, api_key: str):
+        super().__init__(api_key, model="gpt-5-nano")
@@ -1,5 +1,8 @@
 from abc import ABC, abstractmethod
+from array import array
+import bisect
 import os
+import threading
 
 from pydantic import BaseModel
 
@@ -71,13 +74,13 @@ def omit_lines(lines: list[tuple[int, str]], omitted_lines: set[int]) -> list[tu
     Returns:
         List of tuples with specified lines omitted
     """
-    result = []
-    omitted_lines = sorted(omitted_lines)
-    omitted_ranges = []
     if not omitted_lines:
         return lines
 
+    omitted_lines = sorted(omitted_lines)
+
     # Identify continuous ranges
+    omitted_ranges = []
     start = omitted_lines[0]
     end = omitted_lines[0]
     for line in omitted_lines[1:]:
@@ -89,22 +92,26 @@ def omit_lines(lines: list[tuple[int, str]], omitted_lines: set[int]) -> list[tu
             end = line
     omitted_ranges.append((start, end))
 
+    result = []
     omitted_idx = 0
-    current_range = omitted_ranges[omitted_idx] if omitted_ranges else None
+    n_ranges = len(omitted_ranges)
     i = 0
-    while i < len(lines):
+    n = len(lines)
+    while i < n:
         line_num, line_content = lines[i]
-        if current_range and current_range[0] <= line_num <= current_range[1]:
-            # Skip this line
-            if line_num == current_range[1]:
-                # Insert omitted lines info
-                if current_range[0] == current_range[1]:
-                    result.append((-1, f"[omitted lines: {current_range[0]}]"))
-                else:
-                    result.append((-1, f"[omitted lines: {current_range[0]}-{current_range[1]}]"))
-                omitted_idx += 1
-                current_range = omitted_ranges[omitted_idx] if omitted_idx < len(omitted_ranges) else None
-            i += 1
+        # drop ranges that end before the current line
+        while omitted_idx < n_ranges and omitted_ranges[omitted_idx][1] < line_num:
+            omitted_idx += 1
+        if omitted_idx < n_ranges and omitted_ranges[omitted_idx][0] <= line_num:
+            # Insert omitted lines info and jump past the whole run;
+            # lines are contiguous window lines, so the run maps to indices directly
+            (range_start, range_end) = omitted_ranges[omitted_idx]
+            if range_start == range_end:
+                result.append((-1, f"[omitted lines: {range_start}]"))
+            else:
+                result.append((-1, f"[omitted lines: {range_start}-{range_end}]"))
+            omitted_idx += 1
+            i += range_end - line_num + 1
         else:
             result.append((line_num, line_content))
             i += 1
@@ -116,30 +123,102 @@ def omit_lines(lines: list[tuple[int, str]], omitted_lines: set[int]) -> list[tu
 class CachedLocalFileSystem(FileSystem):
     def __init__(self):
         self._cache: dict[str, str] = {}
+        ## line-start offsets into cached content, computed lazily;
+        ## line i (1-based) is content[offs[i-1]:offs[i]-1]
+        self._line_offsets: dict[str, array] = {}
+
+        ## per-path locks so concurrent readers of the same uncached file
+        ## do the disk read only once
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
 
         ## white list of file paths
         self._white_list = set()
+        ## sorted, prefix-free copy of the white list for binary search
+        self._white_list_sorted: list[str] = []
+
+    @staticmethod
+    def _norm(path: str) -> str:
+        # abspath calls getcwd + normpath on every invocation; skip it for
+        # paths that are already absolute and free of '..' segments
+        if os.path.isabs(path) and '..' not in path:
+            return path
+        return os.path.abspath(path)
+
+    def _get_offsets(self, path: str) -> tuple[str, array]:
+        content = self.read_file(path)
+        offs = self._line_offsets.get(path)
+        if offs is None:
+            offs = array('i', [0])
+            i = content.find('\n')
+            while i != -1:
+                offs.append(i + 1)
+                i = content.find('\n', i + 1)
+            if offs[-1] != len(content):
+                # no trailing newline: add a sentinel one past a virtual one
+                # so the last line slices the same way as the others
+                offs.append(len(content) + 1)
+            self._line_offsets[path] = offs
+        return content, offs
 
     def read_file(self, path: str) -> str:
-        path = os.path.abspath(path)
-        if path in self._cache:
-            return self._cache[path]
-        
-        with open(path, 'r') as f:
-            content = f.read()
+        path = self._norm(path)
+        content = self._cache.get(path)
+        if content is not None:
+            return content
+
+        with self._locks_guard:
+            lock = self._locks.setdefault(path, threading.Lock())
+        with lock:
+            # another thread may have filled the cache while we waited
+            content = self._cache.get(path)
+            if content is not None:
+                return content
+            # whole files go straight into the cache; raw os calls read the
+            # file in one syscall instead of going through the text IO stack
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                size = os.fstat(fd).st_size
+                data = os.read(fd, size)
+                # os.read may return short; finish the tail if it does
+                while len(data) < size:
+                    chunk = os.read(fd, size - len(data))
+                    if not chunk:
+                        break
+                    data += chunk
+            finally:
+                os.close(fd)
+            content = data.decode('utf-8')
             self._cache[path] = content
             return content
 
+    def read_file_lines_enum(self, path: str, start_line: int, end_line: int) -> list[tuple[int, str]]:
+        """
+        Return [(line_number, line_content)] for the given 1-based inclusive
+        range, sliced from the cached content via the offset index.
+        """
+        path = self._norm(path)
+        content, offs = self._get_offsets(path)
+        return [(i+1, content[offs[i]:offs[i+1]-1]) for i in range(start_line-1, end_line)]
+
     def read_file_with_lines(self, path: str, start_line: int, end_line: int, with_linenum: bool = False, omitted_lines: str = "") -> str:
-        path = os.path.abspath(path)
-        content = self.read_file(path)
-        lines = content.splitlines()
+        path = self._norm(path)
+        content, offs = self._get_offsets(path)
 
         try:
-            selected_lines = [(i+1, lines[i]) for i in range(start_line-1, end_line)]
-            if omitted_lines:
-                omitted_set = parse_omitted_lines(omitted_lines)
-                selected_lines = omit_lines(selected_lines, omitted_set)
+            if not omitted_lines:
+                if not with_linenum:
+                    if end_line < start_line:
+                        return ""
+                    # the window is a contiguous slice of the cached content
+                    return content[offs[start_line-1]:offs[end_line]-1]
+                return '\n'.join(
+                    f"{i+1}: {content[offs[i]:offs[i+1]-1]}"
+                    for i in range(start_line-1, end_line)
+                )
+            selected_lines = self.read_file_lines_enum(path, start_line, end_line)
+            omitted_set = parse_omitted_lines(omitted_lines)
+            selected_lines = omit_lines(selected_lines, omitted_set)
             if with_linenum:
                 str_lines = []
                 for line_num, line_content in selected_lines:
@@ -150,41 +229,71 @@ class CachedLocalFileSystem(FileSystem):
                 return '\n'.join(str_lines)
             return '\n'.join([line_content for _, line_content in selected_lines])
         except Exception as e:
-            raise ValueError(f"Error reading lines {start_line}-{end_line} from file {path} ({len(lines)} lines): {e}")
+            raise ValueError(f"Error reading lines {start_line}-{end_line} from file {path} ({len(offs) - 1} lines): {e}")
 
     def write_file(self, path: str, content: str, in_memory: bool = False) -> None:
-        path = os.path.abspath(path)
+        path = self._norm(path)
         if not in_memory:
-            with open(path, 'w') as f:
-                f.write(content)
+            # encode once and write the bytes directly, skipping the
+            # incremental encoder and buffer flushes of text-mode open()
+            data = content.encode('utf-8')
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                written = 0
+                while written < len(data):
+                    written += os.write(fd, data[written:])
+            finally:
+                os.close(fd)
         self._cache[path] = content
+        self._line_offsets.pop(path, None)
 
     def add_white_list(self, path: str) -> None:
-        path = os.path.abspath(path)
+        path = self._norm(path)
         self._white_list.add(path)
+        # drop entries already covered by a shorter one; the bisect check in
+        # _is_in_white_list is only correct on a prefix-free sorted list
+        pruned = []
+        for white_path in sorted(self._white_list):
+            if not (pruned and white_path.startswith(pruned[-1])):
+                pruned.append(white_path)
+        self._white_list_sorted = pruned
 
     def _is_in_white_list(self, path: str) -> bool:
         """
         Check if a file path is in the white list.
-        
+
         """
-        if self._white_list:
-            for white_path in self._white_list:
-                if path.startswith(white_path):
-                    return True
-            return False
-        return True
+        white_list = self._white_list_sorted
+        if not white_list:
+            return True
+        # the only entry that can prefix path is the one just before it
+        # in sort order (white list is prefix-free)
+        idx = bisect.bisect_right(white_list, path)
+        return idx > 0 and path.startswith(white_list[idx - 1])
 
     def list_files(self, directory: str) -> list[str]:
         # make sure directory is absolute path
-        directory = os.path.abspath(directory)
+        directory = self._norm(directory)
         if not os.path.isdir(directory):
             # If it's a file, just return the file itself
             return [directory]
-        return [os.path.join(directory, f) for f in os.listdir(directory) if os.path.isfile(os.path.join(directory, f)) and self._is_in_white_list(os.path.join(directory, f))]
+        # DirEntry.is_file uses the cached dirent type, so no stat per entry
+        entries = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                # DirEntry.path is a property; bind it once per entry
+                path = entry.path
+                if entry.is_file(follow_symlinks=False) and self._is_in_white_list(path):
+                    entries.append(path)
+        return entries
     
     def get_file_metadata(self, path: str) -> FileMetadata:
-        path = os.path.abspath(path)
+        path = self._norm(path)
+        offs = self._line_offsets.get(path)
+        if offs is not None:
+            return FileMetadata(lines=len(offs) - 1)
         content = self.read_file(path)
-        lines = content.splitlines()
-        return FileMetadata(lines=len(lines))
\ No newline at end of file
+        if not content:
+            return FileMetadata(lines=0)
+        # str.count runs at memchr speed and allocates no per-line objects
+        return FileMetadata(lines=content.count('\n') + (not content.endswith('\n')))
\ No newline at end of file
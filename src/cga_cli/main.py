@@ -17,63 +17,83 @@ from cga.llm.openai import OpenAIClient
 from cga.utils.fs import CachedLocalFileSystem
 from src.cga.agents.callgraph.types import CallGraph
 
+# graphviz identifiers: map every separator in a node id to '_' in one pass
+_ID_TRANS = str.maketrans({':': '_', '/': '_', '.': '_', '-': '_'})
+
+# model-name -> client-class dispatch tables, shared by all callers
+_OLLAMA_MODELS = {
+    "gpt-oss:20b": GPTOSS_20B,
+    "gemma3:27b": GEMMA3_27B,
+    "gemma3:12b": GEMMA3_12B,
+    "deepseek-r1:32b": DEEPSEEKR1_32B,
+    "deepseek-r1:14b": DEEPSEEKR1_14B,
+}
+
+_OPENAI_MODELS = {
+    "gpt-5": GPT5,
+    "gpt-5-mini": GPT5MINI,
+    "gpt-5-nano": GPT5NANO,
+}
+
 
 def format_callgraph_stdout(call_graph: CallGraph) -> str:
     """Format call graph for stdout output."""
-    output = []
-    output.append("Call Graph Summary:")
-    output.append(f"  Nodes (Functions): {len(call_graph.nodes)}")
-    output.append(f"  Edges (Calls): {len(call_graph.edges)}")
-    output.append("")
-    
-    output.append("Functions:")
-    for node in call_graph.nodes:
-        output.append(f"  - {node.name} ({node.loc.file}:{node.loc.line_start}-{node.loc.line_end})")
-    
-    output.append("")
-    output.append("Function Calls:")
-    for edge in call_graph.edges:
-        # Find the caller and callee names
-        caller = next((n for n in call_graph.nodes if n.id() == edge.caller_id), None)
-        callee = next((n for n in call_graph.nodes if n.id() == edge.callee_id), None)
-        if caller and callee:
-            output.append(f"  - {caller.name} -> {callee.name} (at {edge.attributes.loc.file}:{edge.attributes.loc.line_start})")
-    
-    return "\n".join(output)
+    node_by_id = {n.id(): n for n in call_graph.nodes}
+    header = [
+        "Call Graph Summary:",
+        f"  Nodes (Functions): {len(call_graph.nodes)}",
+        f"  Edges (Calls): {len(call_graph.edges)}",
+        "",
+        "Functions:",
+    ]
+    node_lines = [
+        f"  - {node.name} ({node.loc.file}:{node.loc.line_start}-{node.loc.line_end})"
+        for node in call_graph.nodes
+    ]
+    edge_lines = [
+        f"  - {caller.name} -> {callee.name} (at {edge.attributes.loc.file}:{edge.attributes.loc.line_start})"
+        for edge in call_graph.edges
+        if (caller := node_by_id.get(edge.caller_id)) and (callee := node_by_id.get(edge.callee_id))
+    ]
+    return "\n".join(header + node_lines + ["", "Function Calls:"] + edge_lines)
 
 
-def format_callgraph_json(call_graph: CallGraph) -> str:
+def format_callgraph_json(call_graph: CallGraph, indent: int | None = 2) -> str:
     """Format call graph as JSON."""
-    return call_graph.model_dump_json(indent=2)
+    return call_graph.model_dump_json(indent=indent)
 
 
 def format_callgraph_graphviz(call_graph: CallGraph) -> str:
     """Format call graph as Graphviz DOT format."""
-    output = []
-    output.append("digraph CallGraph {")
-    output.append("  rankdir=LR;")
-    output.append("  node [shape=box];")
-    output.append("")
+    # compute each node id and its normalized form once; edges reuse them
+    ids = [node.id() for node in call_graph.nodes]
+    id_to_norm = {id_str: id_str.translate(_ID_TRANS) for id_str in ids}
 
     def nomalize_id(id_str: str) -> str:
-        return id_str.replace(":", "_").replace("/", "_").replace(".", "_").replace("-", "_")
-    
-    # Add nodes
-    for node in call_graph.nodes:
-        label = f"{node.name}\\n{node.loc.file}:{node.loc.line_start}"
-        node_id = nomalize_id(node.id())
-        output.append(f'  {node_id} [label="{label}"];')
-    
-    output.append("")
-    
-    # Add edges
-    for edge in call_graph.edges:
-        caller_id = nomalize_id(edge.caller_id)
-        callee_id = nomalize_id(edge.callee_id)
-        output.append(f"  {caller_id} -> {callee_id};")
-    
-    output.append("}")
-    return "\n".join(output)
+        norm = id_to_norm.get(id_str)
+        if norm is None:
+            norm = id_str.translate(_ID_TRANS)
+            id_to_norm[id_str] = norm
+        return norm
+
+    header = [
+        "digraph CallGraph {",
+        "  rankdir=LR;",
+        "  node [shape=box];",
+        "",
+    ]
+    # plain concatenation of small ASCII strings avoids the format
+    # machinery in these per-node/per-edge loops
+    node_lines = [
+        '  ' + id_to_norm[node_id] + ' [label="' + node.name + '\\n'
+        + node.loc.file + ':' + str(node.loc.line_start) + '"];'
+        for node, node_id in zip(call_graph.nodes, ids)
+    ]
+    edge_lines = [
+        '  ' + nomalize_id(edge.caller_id) + ' -> ' + nomalize_id(edge.callee_id) + ';'
+        for edge in call_graph.edges
+    ]
+    return "\n".join(header + node_lines + [""] + edge_lines + ["}"])
 
 
 def parse_llm_config(config_string: str) -> dict:
@@ -118,15 +138,6 @@ def create_llm_client(llm_type: str, config: dict) -> LLMClient:
     model = config.get("model", "")
     
     if llm_type == "ollama":
-        # Map model names to their corresponding classes
-        ollama_models = {
-            "gpt-oss:20b": GPTOSS_20B,
-            "gemma3:27b": GEMMA3_27B,
-            "gemma3:12b": GEMMA3_12B,
-            "deepseek-r1:32b": DEEPSEEKR1_32B,
-            "deepseek-r1:14b": DEEPSEEKR1_14B,
-        }
-        
         # Get host from config or environment
         host = config.get("host") or os.getenv("OLLAMA_HOST")
         if not host:
@@ -135,8 +146,8 @@ def create_llm_client(llm_type: str, config: dict) -> LLMClient:
             sys.exit(1)
         
         # Select model class
-        if model in ollama_models:
-            model_class = ollama_models[model]
+        if model in _OLLAMA_MODELS:
+            model_class = _OLLAMA_MODELS[model]
             return model_class(host=host)
         else:
             # Default to generic OllamaLLMClient if model not recognized
@@ -144,13 +155,6 @@ def create_llm_client(llm_type: str, config: dict) -> LLMClient:
             return OllamaLLMClient(host=host)
     
     elif llm_type == "openai":
-        # Map model names to their corresponding classes
-        openai_models = {
-            "gpt-5": GPT5,
-            "gpt-5-mini": GPT5MINI,
-            "gpt-5-nano": GPT5NANO,
-        }
-        
         # Get API key from config or environment
         api_key = config.get("api_key") or os.getenv("OPENAI_API_KEY")
         if not api_key:
@@ -159,8 +163,8 @@ def create_llm_client(llm_type: str, config: dict) -> LLMClient:
             sys.exit(1)
         
         # Select model class
-        if model in openai_models:
-            model_class = openai_models[model]
+        if model in _OPENAI_MODELS:
+            model_class = _OPENAI_MODELS[model]
             return model_class(api_key=api_key)
         else:
             # Default to generic OpenAIClient if model not recognized
@@ -184,8 +188,8 @@ def run_callgraph_agent(input_path: Path, llm_client: LLMClient) -> CallGraph:
     return call_graph
 
 
-def main():
-    """Main entry point for the CLI."""
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the CLI argument parser."""
     parser = argparse.ArgumentParser(
         prog="cga",
         description="Generate call graphs from source code files or directories.",
@@ -240,9 +244,17 @@ Examples:
         default="",
         help="LLM configuration as 'key1=value1 key2=value2'. Examples: 'model=gpt-oss:20b host=http://localhost:11434' or 'model=gpt-5 api_key=YOUR_KEY'"
     )
-    
-    # Parse arguments
-    args = parser.parse_args()
+
+    return parser
+
+
+# built once so in-process callers (tests, batch drivers) don't rebuild it
+_PARSER = _build_parser()
+
+
+def main():
+    """Main entry point for the CLI."""
+    args = _PARSER.parse_args()
     
     # Validate input path
     input_path = Path(args.path)
@@ -268,7 +280,8 @@ Examples:
     
     # Format the output based on the requested format
     if args.format == "json":
-        output_content = format_callgraph_json(call_graph)
+        # compact JSON for files (skips the pretty-print pass); indented for stdout
+        output_content = format_callgraph_json(call_graph, indent=None if args.output else 2)
     elif args.format == "graphviz":
         output_content = format_callgraph_graphviz(call_graph)
     else:  # stdout
@@ -282,8 +295,12 @@ Examples:
             f.write(output_content)
         print(f"Output written to: {output_path}", file=sys.stderr)
     else:
-        print(output_content)
-    
+        # write directly: print() would copy the (possibly huge) string
+        # again while appending the newline
+        sys.stdout.write(output_content)
+        sys.stdout.write('\n')
+        sys.stdout.flush()
+
     return 0
 
 